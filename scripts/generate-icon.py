@@ -3,109 +3,196 @@ Generate Nebula app icon — atom orbital with </> code brackets.
 
 Creates a high-res source icon (1024x1024) then generates all sizes
 required by Tauri for Windows, macOS, iOS, and Android.
+
+Requires Pillow and NumPy. Pillow-SIMD is recommended as a drop-in
+replacement for Pillow; it accelerates the resizes, compositing and fills
+this script spends most of its time in:
+
+    pip uninstall pillow
+    CC="cc -mavx2" pip install pillow-simd
+
+Optional: icnsutil to write a real macOS icon.icns (a PNG with the .icns
+extension is written otherwise).
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
+import numpy as np
+import functools
 import math
 import os
 import struct
 import io
 
+try:
+    import icnsutil
+except ImportError:  # icnsutil is optional; icon.icns falls back to a PNG
+    icnsutil = None
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
 ICONS_DIR = os.path.join(PROJECT_DIR, "src-tauri", "icons")
 
 SIZE = 1024  # Master icon size
 
+# PNG encoder settings. The per-size icons trade a little file size for
+# faster DEFLATE (level 3 is both faster and smaller than level 1 on these
+# images); the master icon keeps Pillow's default compression.
+PNG_FAST = {"compress_level": 3}
+PNG_MASTER = {"compress_level": 6}
 
-def lerp_color(c1, c2, t):
-    """Linear interpolate between two RGB tuples."""
-    return tuple(int(a + (b - a) * t) for a, b in zip(c1, c2))
 
+@functools.lru_cache(maxsize=None)
+def gradient_lut(c1, c2, n=256):
+    """Precompute an n-entry RGB gradient between two RGB tuples."""
+    start = np.array(c1, dtype=np.float64)
+    end = np.array(c2, dtype=np.float64)
+    lut = (start + (end - start) * np.linspace(0, 1, n)[:, None])
+    lut = lut.astype(np.uint8)
+    lut.flags.writeable = False  # Shared between callers via the cache
+    return lut
 
-def draw_thick_arc(draw, cx, cy, rx, ry, angle_start, angle_end, rotation,
-                   width, color_start, color_end, steps=200):
-    """Draw a rotated elliptical arc with gradient color and thickness."""
-    cos_r = math.cos(rotation)
-    sin_r = math.sin(rotation)
 
-    points = []
-    for i in range(steps + 1):
-        t = i / steps
-        angle = math.radians(angle_start + (angle_end - angle_start) * t)
-        # Ellipse point
-        ex = rx * math.cos(angle)
-        ey = ry * math.sin(angle)
-        # Rotate
-        px = cx + ex * cos_r - ey * sin_r
-        py = cy + ex * sin_r + ey * cos_r
-        points.append((px, py, t))
-
-    for i in range(len(points) - 1):
-        x1, y1, t1 = points[i]
-        x2, y2, t2 = points[i + 1]
-        t_mid = (t1 + t2) / 2
-        color = lerp_color(color_start, color_end, t_mid)
-        draw.line([(x1, y1), (x2, y2)], fill=color, width=width)
+def orbital_ring(cx, cy, rx, ry, rotation, steps=200):
+    """Compute the points of a full rotated ellipse.
 
+    Each half (0-180 and 180-360 degrees) spans `steps` segments, so the
+    back and front halves of an orbital are plain slices of the result.
+    """
+    cos_r = math.cos(rotation)
+    sin_r = math.sin(rotation)
 
-def draw_orbital(draw, cx, cy, rx, ry, rotation, color_start, color_end,
-                 width=14, arc_start=0, arc_end=360):
-    """Draw one orbital ring."""
-    draw_thick_arc(draw, cx, cy, rx, ry, arc_start, arc_end,
-                   rotation, width, color_start, color_end)
+    angle = np.linspace(0, 2 * np.pi, 2 * steps + 1)
+    # Ellipse points
+    ex = rx * np.cos(angle)
+    ey = ry * np.sin(angle)
+    # Rotate
+    px = cx + ex * cos_r - ey * sin_r
+    py = cy + ex * sin_r + ey * cos_r
+    return px, py
+
+
+def draw_thick_arc(draw, px, py, width, color_start, color_end):
+    """Draw an arc through the given points with gradient color and width."""
+    steps = len(px) - 1
+
+    # One color per segment, sampled at its midpoint
+    t_mid = (np.arange(steps) + 0.5) / steps
+    lut = gradient_lut(color_start, color_end)
+    colors = lut[(t_mid * (len(lut) - 1)).astype(np.intp)]
+
+    # Outline of the band: the points offset by half the width along the
+    # curve normal, on either side
+    dx = np.gradient(px)
+    dy = np.gradient(py)
+    scale = width / 2 / np.hypot(dx, dy)
+    outer = list(zip((px - dy * scale).tolist(), (py + dx * scale).tolist()))
+    inner = list(zip((px + dy * scale).tolist(), (py - dx * scale).tolist()))
+
+    # Quantize to 32 levels per channel and fill each run of segments that
+    # share a bucket as one polygon, instead of one line call per segment.
+    # Neighbouring runs share their boundary edge, so the band has no cracks.
+    buckets = colors >> 3
+    breaks = np.flatnonzero(np.any(buckets[1:] != buckets[:-1], axis=1)) + 1
+    starts = [0, *breaks.tolist()]
+    ends = [*breaks.tolist(), steps]
+    for start, end in zip(starts, ends):
+        color = tuple(colors[start:end].mean(axis=0).astype(np.uint8).tolist())
+        band = outer[start:end + 1] + inner[start:end + 1][::-1]
+        draw.polygon(band, fill=color)
+
+
+def draw_orbitals(img, arcs, width):
+    """Draw arcs onto a transparent layer and composite it onto img.
+
+    `arcs` is a list of (px, py, color_start, color_end).
+    """
+    layer = Image.new("RGBA", img.size, (0, 0, 0, 0))
+    layer_draw = ImageDraw.Draw(layer)
+    for px, py, c_start, c_end in arcs:
+        draw_thick_arc(layer_draw, px, py, width, c_start, c_end)
+    img.alpha_composite(layer)
 
 
 def draw_sphere(img, cx, cy, radius, base_color, highlight_color):
-    """Draw a glowing sphere (electron)."""
-    draw = ImageDraw.Draw(img)
-    # Outer glow
-    for r in range(radius + 12, radius, -1):
-        alpha = int(60 * (1 - (r - radius) / 12))
-        glow_color = (*base_color, alpha)
-        draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=glow_color)
-    # Sphere body
-    for r in range(radius, 0, -1):
-        t = 1 - (r / radius)
-        color = lerp_color(base_color, highlight_color, t * 0.6)
-        draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=color)
-    # Specular highlight
-    hx, hy = cx - radius * 0.3, cy - radius * 0.3
+    """Draw a glowing sphere (electron).
+
+    The glow, body and specular highlight are computed together in one RGBA
+    array and alpha-composited onto the image in a single call.
+    """
+    glow = 12
+    half = radius + glow
+    ys, xs = np.ogrid[-half:half + 1, -half:half + 1]
+    r = np.hypot(xs, ys)
+
+    # Sphere body, with a soft outer glow in the base color
+    t = np.clip(1 - r / radius, 0, 1)[..., None] * 0.6
+    base = np.array(base_color, dtype=np.float64)
+    hi = np.array(highlight_color, dtype=np.float64)
+    rgb = base + (hi - base) * t
+    alpha = np.where(r <= radius, 1.0,
+                     np.clip(60 * (1 - (r - radius) / glow), 0, 60) / 255)
+
+    # Specular highlight, blended as white "over" the body in place
+    h_off = radius * 0.3
     hr = radius * 0.35
-    for r2 in range(int(hr), 0, -1):
-        alpha = int(200 * (1 - r2 / hr))
-        draw.ellipse([hx - r2, hy - r2, hx + r2, hy + r2],
-                     fill=(255, 255, 255, alpha))
+    r2 = np.hypot(xs + h_off, ys + h_off)
+    spec = np.clip(200 * (1 - r2 / hr), 0, 200) / 255
+    out_alpha = spec + alpha * (1 - spec)
+    weight = (alpha * (1 - spec) / np.maximum(out_alpha, 1e-6))[..., None]
+    rgb = 255 + (rgb - 255) * weight
+
+    sprite = Image.fromarray(
+        np.dstack([rgb, out_alpha * 255]).astype(np.uint8), "RGBA")
+    img.alpha_composite(sprite, (cx - half, cy - half))
 
 
 def draw_sparkle(draw, x, y, size, color=(255, 255, 220)):
-    """Draw a small sparkle / star."""
+    """Draw a small sparkle / star.
+
+    All four strokes are drawn as one polyline that returns to the center
+    between strokes, so each sparkle costs a single draw call.
+    """
     s = size
-    # Vertical line
-    draw.line([(x, y - s), (x, y + s)], fill=color, width=1)
-    # Horizontal line
-    draw.line([(x - s, y), (x + s, y)], fill=color, width=1)
-    # Diagonal lines (smaller)
-    ds = s * 0.6
-    draw.line([(x - ds, y - ds), (x + ds, y + ds)], fill=color, width=1)
-    draw.line([(x + ds, y - ds), (x - ds, y + ds)], fill=color, width=1)
+    ds = s * 0.6  # Diagonal lines are smaller
+    draw.line([
+        (x, y - s), (x, y + s), (x, y),              # Vertical line
+        (x - s, y), (x + s, y), (x, y),              # Horizontal line
+        (x - ds, y - ds), (x + ds, y + ds), (x, y),  # Diagonal lines
+        (x + ds, y - ds), (x - ds, y + ds),
+    ], fill=color, width=1)
+
+
+@functools.lru_cache(maxsize=4)
+def load_bracket_font(size):
+    """Load a clean monospace font for the brackets, cached per size."""
+    try:
+        return ImageFont.truetype("consola.ttf", size)
+    except (OSError, IOError):
+        try:
+            return ImageFont.truetype("cour.ttf", size)
+        except (OSError, IOError):
+            try:
+                return ImageFont.truetype("C:/Windows/Fonts/consola.ttf", size)
+            except (OSError, IOError):
+                return ImageFont.load_default()
 
 
 def create_nebula_icon():
     """Create the main 1024x1024 Nebula icon."""
-    img = Image.new("RGBA", (SIZE, SIZE), (0, 0, 0, 255))
-    draw = ImageDraw.Draw(img)
-
     cx, cy = SIZE // 2, SIZE // 2
 
     # --- Background: subtle radial gradient (dark center) ---
-    for r in range(SIZE // 2, 0, -1):
-        t = r / (SIZE // 2)
-        # Dark center to slightly lighter edges
-        val = int(8 + 12 * t)
-        alpha = 255
-        color = (val, val, int(val * 1.2), alpha)
-        draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=color)
+    # Dark center to slightly lighter edges; black outside the circle
+    y, x = np.ogrid[:SIZE, :SIZE]
+    dist = np.hypot(x - cx, y - cy)
+    t = np.clip(dist / (SIZE // 2), 0, 1)
+    val = np.where(dist <= SIZE // 2, 8 + 12 * t, 0).astype(np.uint8)
+    background = np.dstack([val, val, (val * 1.2).astype(np.uint8),
+                            np.full_like(val, 255)])
+    img = Image.fromarray(background, "RGBA")
+    draw = ImageDraw.Draw(img)
 
     # --- Orbital parameters ---
     rx, ry = 340, 130  # Ellipse radii
@@ -125,25 +212,20 @@ def create_nebula_icon():
         (90, ORANGE, RED_ORANGE),
     ]
 
-    # Draw back halves first (behind text)
-    for rot_deg, c_start, c_end in orbitals:
-        rot = math.radians(rot_deg)
-        draw_orbital(draw, cx, cy, rx, ry, rot, c_start, c_end,
-                     width=16, arc_start=180, arc_end=360)
+    # Points around each full orbital, computed once. The back half is
+    # 180-360 degrees and the front half 0-180, each 200 segments long.
+    steps = 200
+    rings = [(orbital_ring(cx, cy, rx, ry, math.radians(rot_deg), steps),
+              c_start, c_end)
+             for rot_deg, c_start, c_end in orbitals]
+
+    # Draw back halves first (behind text). Arcs are rasterized onto a
+    # transparent layer that is composited onto the icon in one go.
+    draw_orbitals(img, [(px[steps:], py[steps:], c_start, c_end)
+                        for (px, py), c_start, c_end in rings], width=16)
 
     # --- Code brackets </> ---
-    # Use a clean font for the brackets
-    bracket_size = 240
-    try:
-        font = ImageFont.truetype("consola.ttf", bracket_size)
-    except (OSError, IOError):
-        try:
-            font = ImageFont.truetype("cour.ttf", bracket_size)
-        except (OSError, IOError):
-            try:
-                font = ImageFont.truetype("C:/Windows/Fonts/consola.ttf", bracket_size)
-            except (OSError, IOError):
-                font = ImageFont.load_default()
+    font = load_bracket_font(240)
 
     text = "</>"
     # Get text bounding box
@@ -158,10 +240,8 @@ def create_nebula_icon():
     draw.text((tx, ty), text, fill=(230, 230, 240, 255), font=font)
 
     # Draw front halves of orbitals (in front of text)
-    for rot_deg, c_start, c_end in orbitals:
-        rot = math.radians(rot_deg)
-        draw_orbital(draw, cx, cy, rx, ry, rot, c_start, c_end,
-                     width=16, arc_start=0, arc_end=180)
+    draw_orbitals(img, [(px[:steps + 1], py[:steps + 1], c_start, c_end)
+                        for (px, py), c_start, c_end in rings], width=16)
 
     # --- Electron spheres ---
     # Position electrons on the orbitals
@@ -198,51 +278,97 @@ def create_nebula_icon():
 
 
 def create_ico(images, ico_path):
-    """Create a .ico file from a list of PIL Images."""
+    """Create a .ico file from a list of (size, PNG bytes) pairs."""
     # ICO format: header + directory entries + image data
     num_images = len(images)
 
     # ICO header: reserved(2) + type(2) + count(2)
     header = struct.pack("<HHH", 0, 1, num_images)
 
-    # We'll store PNG-compressed data for each size
-    image_data_list = []
-    for img in images:
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        image_data_list.append(buf.getvalue())
-
     # Directory entries (16 bytes each), then image data
     dir_offset = 6 + num_images * 16  # After header + all directory entries
-    directory = b""
+    directory = bytearray(16 * num_images)
     current_offset = dir_offset
 
-    for i, img in enumerate(images):
-        w = img.width if img.width < 256 else 0
-        h = img.height if img.height < 256 else 0
-        data_size = len(image_data_list[i])
+    for i, (size, data) in enumerate(images):
+        w = size if size < 256 else 0
+        h = size if size < 256 else 0
+        data_size = len(data)
         # width, height, color_count, reserved, planes, bit_count, size, offset
-        entry = struct.pack("<BBBBHHII", w, h, 0, 0, 1, 32, data_size, current_offset)
-        directory += entry
+        struct.pack_into("<BBBBHHII", directory, i * 16,
+                         w, h, 0, 0, 1, 32, data_size, current_offset)
         current_offset += data_size
 
     with open(ico_path, "wb") as f:
-        f.write(header)
-        f.write(directory)
-        for data in image_data_list:
-            f.write(data)
+        f.writelines([header, directory, *(data for _, data in images)])
+
+
+def create_icns(images, icns_path):
+    """Create a .icns file from a list of (icns type, PNG bytes) pairs."""
+    icns = icnsutil.IcnsFile()
+    for key, data in images:
+        icns.add_media(key, data=data)
+    icns.write(icns_path)
+
+
+def build_downscale_chain(master, steps=(512, 128)):
+    """Progressively downscale the master icon, largest first."""
+    chain = [master]
+    for size in steps:
+        chain.append(chain[-1].resize((size, size), Image.LANCZOS))
+    return chain
+
+
+def resize_icon(chain, size):
+    """Resize from the smallest cached source at least twice the target."""
+    source = chain[0]
+    for candidate in chain[1:]:
+        if candidate.width == size:
+            return candidate
+        if candidate.width >= 2 * size:
+            source = candidate
+    return source.resize((size, size), Image.LANCZOS)
+
+
+def encode_png(img, params=PNG_FAST):
+    """Encode an image as PNG bytes."""
+    buf = io.BytesIO()
+    img.save(buf, "PNG", **params)
+    return buf.getvalue()
+
+
+def render_png(chain, size):
+    """Resize the icon to a square size and encode it as PNG."""
+    return encode_png(resize_icon(chain, size))
+
+
+def write_file(path, data):
+    """Write already-encoded bytes to disk."""
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def has_pillow_simd():
+    """Check whether PIL is provided by Pillow-SIMD."""
+    try:
+        metadata.version("pillow-simd")
+    except metadata.PackageNotFoundError:
+        return False
+    return True
 
 
 def main():
+    if not has_pillow_simd():
+        print("Note: Pillow-SIMD not found, using stock Pillow. "
+              "Install pillow-simd for faster icon generation.")
     print("Generating Nebula icon...")
     master = create_nebula_icon()
 
     os.makedirs(ICONS_DIR, exist_ok=True)
 
-    # Save master
-    master_path = os.path.join(ICONS_DIR, "icon.png")
-    master.save(master_path, "PNG")
-    print(f"  Saved {master_path}")
+    # Intermediate downscales shared by all small sizes, so a 16x16 icon
+    # doesn't convolve LANCZOS over the full 1024x1024 master
+    chain = build_downscale_chain(master)
 
     # Generate all required sizes for Tauri
     sizes = {
@@ -262,33 +388,68 @@ def main():
         "Square310x310Logo.png": 310,
         "StoreLogo.png": 50,
     }
-
-    for filename, size in sizes.items():
-        resized = master.resize((size, size), Image.LANCZOS)
-        path = os.path.join(ICONS_DIR, filename)
-        resized.save(path, "PNG")
-        print(f"  Saved {path} ({size}x{size})")
-
-    # Generate .ico (Windows) — multiple sizes embedded
+    # Sizes embedded in the .ico (Windows)
     ico_sizes = [16, 24, 32, 48, 64, 128, 256]
-    ico_images = [master.resize((s, s), Image.LANCZOS) for s in ico_sizes]
-    ico_path = os.path.join(ICONS_DIR, "icon.ico")
-    create_ico(ico_images, ico_path)
-    print(f"  Saved {ico_path} (multi-size ICO)")
-
-    # Generate .icns placeholder (macOS) — save as PNG, macOS builds would
-    # need a proper icns tool. For now create a large PNG with .icns extension
-    # that Tauri can work with on macOS builds.
-    icns_source = master.resize((512, 512), Image.LANCZOS)
-    icns_path = os.path.join(ICONS_DIR, "icon.icns")
-    # For a real .icns we'd need a mac tool. Save as PNG — Tauri's bundler
-    # on macOS will handle conversion. On Windows this file isn't used.
-    icns_source.save(icns_path, "PNG")
-    print(f"  Saved {icns_path} (PNG for macOS)")
-
-    # Also save source as app-icon.png in project root for `tauri icon` command
+    # Types embedded in the .icns (macOS): the standard iconset sizes, each
+    # at 1x and @2x
+    icns_types = [
+        ("icp4", 16), ("ic11", 32),    # 16x16, 16x16@2x
+        ("icp5", 32), ("ic12", 64),    # 32x32, 32x32@2x
+        ("ic07", 128), ("ic13", 256),  # 128x128, 128x128@2x
+        ("ic08", 256), ("ic14", 512),  # 256x256, 256x256@2x
+        ("ic09", 512), ("ic10", 1024),  # 512x512, 512x512@2x
+    ]
+    # Size of the .icns placeholder when icnsutil isn't installed
+    icns_fallback_size = 512
+    icns_sizes = ([s for _, s in icns_types] if icnsutil is not None
+                  else [icns_fallback_size])
+
+    # Every size is resized and PNG-encoded exactly once, and the bytes are
+    # shared between the standalone PNGs, the ICO and the ICNS. The master
+    # itself is encoded once as well and covers the full-size ICNS entry.
+    # Pillow releases the GIL while resizing and encoding, so a thread pool
+    # runs them in parallel.
+    png_sizes = sorted({*sizes.values(), *ico_sizes, *icns_sizes} - {SIZE})
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        master_job = pool.submit(encode_png, master, PNG_MASTER)
+        png_jobs = {size: pool.submit(render_png, chain, size)
+                    for size in png_sizes}
+        png_cache = {size: job.result() for size, job in png_jobs.items()}
+        png_cache[SIZE] = master_job.result()
+
+        # Save master
+        master_path = os.path.join(ICONS_DIR, "icon.png")
+        write_file(master_path, png_cache[SIZE])
+        print(f"  Saved {master_path}")
+
+        for filename, size in sizes.items():
+            path = os.path.join(ICONS_DIR, filename)
+            write_file(path, png_cache[size])
+            print(f"  Saved {path} ({size}x{size})")
+
+        # Generate .ico (Windows) — multiple sizes embedded
+        ico_path = os.path.join(ICONS_DIR, "icon.ico")
+        create_ico([(s, png_cache[s]) for s in ico_sizes], ico_path)
+        print(f"  Saved {ico_path} (multi-size ICO)")
+
+        # Generate .icns (macOS) — multiple sizes embedded
+        icns_path = os.path.join(ICONS_DIR, "icon.icns")
+        if icnsutil is not None:
+            create_icns([(key, png_cache[s]) for key, s in icns_types],
+                        icns_path)
+            print(f"  Saved {icns_path} (multi-size ICNS)")
+        else:
+            # Without icnsutil, save a large PNG with .icns extension —
+            # Tauri's bundler on macOS will handle conversion. On Windows
+            # this file isn't used.
+            write_file(icns_path, png_cache[icns_fallback_size])
+            print(f"  Saved {icns_path} (PNG for macOS)")
+
+    # Also save source as app-icon.png in project root for `tauri icon`
+    # command. It is identical to icon.png, so write the same encoded bytes
+    # rather than encoding the master again.
     app_icon_path = os.path.join(PROJECT_DIR, "app-icon.png")
-    master.save(app_icon_path, "PNG")
+    write_file(app_icon_path, png_cache[SIZE])
     print(f"  Saved {app_icon_path} (source for tauri icon)")
 
     print("\nDone! All icons generated successfully.")